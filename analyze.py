@@ -1,8 +1,11 @@
 import pandas as pd
 import numpy as np
-import unicodedata
 import argparse
+import hashlib
+import math
+import operator
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
@@ -20,6 +23,12 @@ NAME_FIX: Dict[str, str] = {
     "nottm forest": "nottingham forest",
 }
 
+# Team statuses (order defines the categorical codes of the Status column)
+STATUS_CATEGORIES: List[str] = ["IN_PLAY", "OUT", "LOCKED_DIRECT_RO16", "LOCKED_PLAYOFFS"]
+
+# Status codes used by the enrichment core (must follow STATUS_CATEGORIES order)
+_ST_IN_PLAY, _ST_OUT, _ST_LOCKED_RO16, _ST_LOCKED_PO = range(4)
+
 # Status Point Bonuses for Value Calculation
 STATUS_BONUSES: Dict[str, float] = {
     "OUT": 0.22,
@@ -27,104 +36,155 @@ STATUS_BONUSES: Dict[str, float] = {
     "LOCKED_PLAYOFFS": 0.15
 }
 
-# Values for recommendations
-RECOMMENDATION_LEVELS = [
-    ("🔴 AVOID (OUT)", lambda df: df["Status"] == "OUT"),
-    ("🟠 CAUTION (Rotation)", lambda df: df["Risk"] >= 1.6),
-    ("🟢 STRONG BUY", lambda df: df["Val"] >= 70),
-    ("🟡 CONSIDER", lambda df: df["Val"] >= 50),
+# Rotation Risk penalties per status
+ROTATION_PENALTIES: Dict[str, float] = {
+    "OUT": 0.95,
+    "LOCKED_DIRECT_RO16": 0.65,
+    "LOCKED_PLAYOFFS": 0.38
+}
+
+# Lookup arrays aligned with STATUS_CATEGORIES, indexed by Status .cat.codes
+STATUS_BONUS_ARR: np.ndarray = np.array([STATUS_BONUSES.get(c, 0.0) for c in STATUS_CATEGORIES])
+ROTATION_PENALTY_ARR: np.ndarray = np.array([ROTATION_PENALTIES.get(c, 0.0) for c in STATUS_CATEGORIES])
+
+# Values for recommendations: (label, column, comparison, threshold), first match wins
+RECOMMENDATION_LEVELS: List[Tuple[str, str, str, float | str]] = [
+    ("🔴 AVOID (OUT)", "Status", "==", "OUT"),
+    ("🟠 CAUTION (Rotation)", "Risk", ">=", 1.6),
+    ("🟢 STRONG BUY", "Val", ">=", 70),
+    ("🟡 CONSIDER", "Val", ">=", 50),
 ]
+_COMPARISONS = {"==": operator.eq, ">=": operator.ge}
 
 # ========================================
 # HELPERS: NORMALIZATION & MAPPING
 # ========================================
-def remove_diacritics(s: str) -> str:
-    """Removes diacritics and normalizes text to ASCII (includes ø, ł, æ, etc.)."""
-    mapping: Dict[int | str, int | str | None] = {
-        '\u00f8': 'o', '\u00d8': 'O', '\u0142': 'l', '\u0141': 'L', 
-        '\u00e6': 'ae', '\u00c6': 'AE', '\u00e5': 'a', '\u00c5': 'A'
-    }
-    s = s.translate(str.maketrans(mapping))
-    normalized = unicodedata.normalize('NFD', s)
-    return "".join(c for c in normalized if unicodedata.category(c) != 'Mn')
-
-def norm_key(s: Optional[str]) -> str:
-    """Creates a normalized key for team names."""
-    if pd.isna(s) or s is None: return ""
-    s = remove_diacritics(str(s)).strip().lower()
-    return NAME_FIX.get(s, s)
+# Characters without an NFD decomposition (ø, ł, æ, å), built once at import
+_DIACRITIC_TABLE: Dict[int, str] = str.maketrans({
+    '\u00f8': 'o', '\u00d8': 'O', '\u0142': 'l', '\u0141': 'L',
+    '\u00e6': 'ae', '\u00c6': 'AE', '\u00e5': 'a', '\u00c5': 'A'
+})
+
+def norm_series(s: pd.Series) -> pd.Series:
+    """Creates normalized keys for a column of team names (diacritics removed, lowercase, NAME_FIX applied)."""
+    return (
+        s.fillna("").astype(str)
+        .str.translate(_DIACRITIC_TABLE)
+        .str.normalize('NFD').str.replace('[\u0300-\u036f]', '', regex=True)
+        .str.strip().str.lower()
+        .replace(NAME_FIX)
+    )
 
 # ========================================
 # CORE MATH & LOGIC
 # ========================================
-def sigmoid(x: pd.Series) -> pd.Series:
-    """Standard sigmoid function."""
-    return 1 / (1 + np.exp(-x))
-
-def pressure_vector(p: pd.Series, beta: float = 0.35) -> pd.Series:
+def _pressure(p: float, beta: float = 0.35) -> float:
     """PRESSURE() - Measures uncertainty around transition thresholds."""
-    p_val = np.clip(p, 0.0, 1.0)
-    res = (2 * np.minimum(p_val, 1 - p_val)) ** beta
-    return np.where((p_val > 0) & (p_val < 1), res, 0.0)
+    p = min(max(p, 0.0), 1.0)
+    if p <= 0.0 or p >= 1.0: return 0.0
+    return (2.0 * min(p, 1.0 - p)) ** beta
+
+def _enrich_core(l16, kpo, qf, sf, fnl, wnr, xpos, rot_pen):
+    """Per-team status code, motivation and rotation risk in a single pass (probabilities in [0, 1])."""
+    n = l16.shape[0]
+    status = np.empty(n, np.int8)
+    mot = np.empty(n)
+    rot = np.empty(n)
+    for i in range(n):
+        # Survival Probability: disjoint sum, max of all stages on anomaly, knockout floor
+        row_max = max(l16[i], kpo[i], qf[i], sf[i], fnl[i], wnr[i])
+        raw_sum = l16[i] + kpo[i]
+        p_surv = raw_sum if raw_sum <= 1.000001 else row_max
+        p_surv = min(max(p_surv, row_max, 0.0), 1.0)
+        p_top8 = l16[i]
+
+        # Status classification (by precedence)
+        if p_surv >= 0.985 and p_top8 <= 0.02: st = _ST_LOCKED_PO
+        elif p_top8 >= 0.985: st = _ST_LOCKED_RO16
+        elif p_surv <= 0.015: st = _ST_OUT
+        else: st = _ST_IN_PLAY
+        status[i] = st
+
+        # Motivation logic
+        m_seed = 0.0
+        if 7 <= xpos[i] <= 18 and kpo[i] > 0.4:
+            m_seed = 22 * math.exp(-((xpos[i] - 12.5) / 4.0) ** 2)
+        m = min(max(12 + 65 * _pressure(p_surv) + 45 * _pressure(p_top8) + m_seed, 0.0), 100.0)
+        mot[i] = m
+
+        # Rotation Risk logic
+        rot[i] = min(max((1.0 + rot_pen[st]) * (1.15 - 0.35 * (m / 100.0)), 1.0), 2.3)
+    return status, mot, rot
 
 # ========================================
 # DATA ENGINE
 # ========================================
-def cast_numeric(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
-    """Utility to clean and cast columns to float. Handles both dot and comma decimals."""
-    for c in cols:
-        if c in df.columns:
-            # Convert to string, replace comma with dot, then back to numeric
-            df[c] = pd.to_numeric(
-                df[c].astype(str).str.replace(",", "."), 
-                errors="coerce"
-            ).fillna(0.0)
-    return df
+def parse_decimal(v: str) -> float:
+    """CSV converter: parses a cell with either dot or comma decimal (empty/invalid/nan -> 0.0)."""
+    try:
+        x = float(v.replace(",", ".")) if v else 0.0
+    except ValueError:
+        return 0.0
+    return x if math.isfinite(x) else 0.0
 
-def read_smart_csv(path: Path) -> pd.DataFrame:
-    """Reads CSV with automatic separator detection (handles ; and ,)."""
+def read_smart_csv(path: Path, **kwargs) -> pd.DataFrame:
+    """Reads CSV with automatic separator detection (handles ; and ,). Extra kwargs go to pd.read_csv."""
     try:
-        # Try reading a few lines to detect separator
-        with open(path, 'r', encoding='utf-8-sig') as f:
-            first_line = f.readline()
-            sep = ';' if ';' in first_line else ','
-        
-        return pd.read_csv(path, sep=sep, encoding="utf-8-sig")
-    except UnicodeDecodeError:
-        # Fallback to standard utf-8
-        with open(path, 'r', encoding='utf-8') as f:
-            first_line = f.readline()
-            sep = ';' if ';' in first_line else ','
-        return pd.read_csv(path, sep=sep, encoding="utf-8")
+        with open(path, 'rb') as f:
+            # Sniff separator from the header line, then let pandas parse the same handle
+            first_line = f.read(4096).split(b'\n', 1)[0]
+            sep = ';' if b';' in first_line else ','
+            f.seek(0)
+            try:
+                return pd.read_csv(f, sep=sep, encoding="utf-8-sig", **kwargs)
+            except UnicodeDecodeError:
+                # Fallback to standard utf-8
+                f.seek(0)
+                return pd.read_csv(f, sep=sep, encoding="utf-8", **kwargs)
     except FileNotFoundError:
         print(f"ERROR: Missing file: {path}")
         sys.exit(1)
 
-def load_league_data(prefix: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """Loads fixtures and predicted table for a given league prefix (cl/el)."""
+def league_paths(prefix: str) -> Tuple[Path, Path]:
+    """Returns (fixtures, predicted table) CSV paths for a given league prefix (cl/el)."""
     league_dir = "champions-league" if prefix == "cl" else "europa-league"
     data_dir = BASE_DIR / "data" / league_dir
-    
-    fixtures_path = data_dir / f"{prefix}_fixtures.csv"
-    table_path = data_dir / f"{prefix}_table_predicted.csv"
+    return data_dir / f"{prefix}_fixtures.csv", data_dir / f"{prefix}_table_predicted.csv"
+
+def load_league_data(prefix: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Loads fixtures and predicted table for a given league prefix (cl/el)."""
+    fixtures_path, table_path = league_paths(prefix)
 
-    f, t = read_smart_csv(fixtures_path), read_smart_csv(table_path)
-    
     fixtures_num = ["HomeWin%", "Draw%", "AwayWin%"]
     table_num = ["XPOS", "XPTS", "LEAGUE%", "KO P/0%", "LAST 16%", "QF%", "SF%", "FINAL%", "WINNER%"]
 
-    return cast_numeric(f, fixtures_num), cast_numeric(t, table_num)
-
-def validate_integrity(df: pd.DataFrame, league_name: str) -> None:
-    """Audits data integrity."""
-    print(f"\n--- {league_name} DATA INTEGRITY REPORT ---")
+    # Numeric columns are parsed inside read_csv; team names skip object-dtype inference.
+    # Both files are read concurrently; this overlaps file I/O only, since the
+    # parse_decimal converter runs as Python code and holds the GIL.
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fut_f = ex.submit(
+            read_smart_csv, fixtures_path,
+            converters={c: parse_decimal for c in fixtures_num},
+            dtype={"HomeTeam": "string", "AwayTeam": "string"},
+        )
+        fut_t = ex.submit(
+            read_smart_csv, table_path,
+            converters={c: parse_decimal for c in table_num},
+            dtype={"TEAM": "string"},
+        )
+        f, t = fut_f.result(), fut_t.result()
+    return f, t
+
+def validate_integrity(df: pd.DataFrame, league_name: str) -> str:
+    """Audits data integrity. Prints the report and returns its text."""
+    lines = [f"\n--- {league_name} DATA INTEGRITY REPORT ---"]
     
     cols_to_check = ["LAST 16%", "KO P/0%", "QF%", "SF%", "FINAL%", "WINNER%"]
     
     # Range check
     out_of_range = (df[cols_to_check] < 0) | (df[cols_to_check] > 100)
     if out_of_range.any().any():
-        print(f"⚠️  VALUES OUT OF RANGE [0, 100] DETECTED!")
+        lines.append("⚠️  VALUES OUT OF RANGE [0, 100] DETECTED!")
     
     # Monotonicity
     viol = ~(
@@ -133,129 +193,207 @@ def validate_integrity(df: pd.DataFrame, league_name: str) -> None:
         (df["SF%"] <= df["QF%"] + 1e-6)
     )
     if viol.any():
-        print(f"⚠️  MONOTONICITY VIOLATIONS ({viol.sum() or 0} teams)")
+        lines.append(f"⚠️  MONOTONICITY VIOLATIONS ({viol.sum() or 0} teams)")
     else:
-        print("✅ Monotonicity (W<=F<=SF<=Q): OK")
+        lines.append("✅ Monotonicity (W<=F<=SF<=Q): OK")
 
     # Top 24 Consistency
     raw_sum = df["LAST 16%"] + df["KO P/0%"]
     anom = raw_sum > 100.0001
     if anom.any():
-        print(f"⚠️  INCONSISTENT TOP 24 (Sum > 100% for {anom.sum() or 0} teams)")
+        lines.append(f"⚠️  INCONSISTENT TOP 24 (Sum > 100% for {anom.sum() or 0} teams)")
     else:
-        print("✅ Top 24 Consistency: OK")
-    print("-" * 30)
+        lines.append("✅ Top 24 Consistency: OK")
+    lines.append("-" * 30)
+    report = "\n".join(lines)
+    print(report)
+    return report
 
 def enrich_table(table: pd.DataFrame, league_name: str) -> pd.DataFrame:
-    """Calculates status, motivation, and risk indices."""
-    df = table.copy()
-    validate_integrity(df, league_name)
+    """Calculates status, motivation, and risk indices. Adds the columns to `table` in place and returns it."""
+    df = table
+    df.attrs["integrity_report"] = validate_integrity(df, league_name)
 
     # Normalization helper
-    s = lambda col: df[col].fillna(0.0).clip(0, 100) / 100.0
-    
-    l16, kpo, qf, sf, fnl, wnr = (s(c) for c in ["LAST 16%", "KO P/0%", "QF%", "SF%", "FINAL%", "WINNER%"])
-
-    # Survival Probability
-    raw_sum = l16 + kpo
-    p_surv = np.where(raw_sum <= 1.000001, raw_sum, np.maximum.reduce([l16, kpo, qf, sf, fnl, wnr]))
-    p_surv = np.maximum.reduce([p_surv, qf, sf, fnl, wnr]).clip(0, 1)
-    
-    p_top8 = l16
-
-    # Status classification
-    df["Status"] = "IN_PLAY"
-    df.loc[p_surv <= 0.015, "Status"] = "OUT"
-    df.loc[p_top8 >= 0.985, "Status"] = "LOCKED_DIRECT_RO16"
-    df.loc[(p_surv >= 0.985) & (p_top8 <= 0.02), "Status"] = "LOCKED_PLAYOFFS"
-
-    # Motivation logic
-    m_surv = 65 * pressure_vector(p_surv)
-    m_t8 = 45 * pressure_vector(p_top8)
-    seed_p = np.exp(-((df["XPOS"] - 12.5) / 4.0) ** 2)
-    m_seed = np.where((df["XPOS"] >= 7) & (df["XPOS"] <= 18) & (kpo > 0.4), 22 * seed_p, 0.0)
-    
-    df["Motivation"] = (12 + m_surv + m_t8 + m_seed).clip(0, 100)
+    s = lambda col: (df[col].fillna(0.0).clip(0, 100) / 100.0).to_numpy(np.float64)
 
-    # Rotation Risk logic
-    rot_map = {"OUT": 0.95, "LOCKED_DIRECT_RO16": 0.65, "LOCKED_PLAYOFFS": 0.38}
-    rot = (1.0 + df["Status"].map(rot_map).fillna(0.0))
-    
-    df["RotRisk"] = (rot * (1.15 - 0.35 * (df["Motivation"] / 100.0))).clip(1.0, 2.3)
+    status, mot, rot = _enrich_core(
+        *(s(c) for c in ["LAST 16%", "KO P/0%", "QF%", "SF%", "FINAL%", "WINNER%"]),
+        df["XPOS"].fillna(0.0).to_numpy(np.float64), ROTATION_PENALTY_ARR
+    )
+    df["Status"] = pd.Categorical.from_codes(status, categories=STATUS_CATEGORIES)
+    df["Motivation"] = mot
+    df["RotRisk"] = rot
     return df
 
 def calculate_values(df: pd.DataFrame) -> pd.DataFrame:
     """Vectorized calculation of Value Indices for home and away teams."""
-    def calc_val(pfx, opp):
-        tm_m, op_m = df[f"Mot_{pfx}"] / 100.0, df[f"Mot_{opp}"] / 100.0
-        st_b = df[f"Status_{opp}"].map(STATUS_BONUSES).fillna(0.0)
-        mot_b = 0.18 * sigmoid((0.45 - op_m) / 0.08)
-        opp_dead = (1.0 + st_b + mot_b).clip(1.0, 1.35)
-        return (100 * (df[f"EV_{pfx}"] / 3.0) * (0.55 + 0.45 * tm_m) * opp_dead / df[f"Risk_{pfx}"]).clip(0, 140)
-
-    df["Val_H"] = calc_val("H", "A")
-    df["Val_A"] = calc_val("A", "H")
+    # Row 0 = home side, row 1 = away side; the opponent of each row is the other row
+    cols = lambda name: np.stack([df[f"{name}_H"].to_numpy(np.float64), df[f"{name}_A"].to_numpy(np.float64)])
+    tm_m, ev, risk = cols("Mot") / 100.0, cols("EV"), cols("Risk")
+    st_b = STATUS_BONUS_ARR[np.stack([df["Status_H"].cat.codes.to_numpy(), df["Status_A"].cat.codes.to_numpy()])]
+    op_m, op_b = tm_m[::-1], st_b[::-1]
+
+    try:
+        import numexpr as ne  # optional: fuses elementwise formulas into one pass
+    except ImportError:
+        ne = None
+
+    if ne is not None:
+        # Same formulas as the NumPy branch, fused by numexpr (sigmoid written out)
+        opp_dead = ne.evaluate("1 + op_b + 0.18 / (1 + exp((op_m - 0.45) / 0.08))")
+        np.clip(opp_dead, 1.0, 1.35, out=opp_dead)
+        val = ne.evaluate("100 * (ev / 3) * (0.55 + 0.45 * tm_m) * opp_dead / risk")
+        np.clip(val, 0, 140, out=val)
+    else:
+        mot_b = 0.18 * (1 / (1 + np.exp(-(0.45 - op_m) / 0.08)))
+        opp_dead = np.clip(1.0 + op_b + mot_b, 1.0, 1.35)
+        val = np.clip(100 * (ev / 3.0) * (0.55 + 0.45 * tm_m) * opp_dead / risk, 0, 140)
+
+    df["Val_H"], df["Val_A"] = val[0], val[1]
     return df
 
 def format_recommendations(ranking: pd.DataFrame) -> pd.DataFrame:
-    """Adds recommendation labels and rounds numeric values."""
-    cond = [check(ranking) for _, check in RECOMMENDATION_LEVELS]
-    choices = [label for label, _ in RECOMMENDATION_LEVELS]
+    """Adds recommendation labels and rounds numeric values. The input frame is consumed (modified in place)."""
+    arrays = {col: ranking[col].to_numpy() for _, col, _, _ in RECOMMENDATION_LEVELS}
+    cond = [_COMPARISONS[op](arrays[col], thr) for _, col, op, thr in RECOMMENDATION_LEVELS]
+    choices = [label for label, _, _, _ in RECOMMENDATION_LEVELS]
     ranking["Recommendation"] = np.select(cond, choices, default="⚪ NEUTRAL")
 
-    ranking["Win%"] = (ranking["Win%"] * 100).round(1)
-    for c in ["EV", "Risk"]: ranking[c] = ranking[c].round(2)
-    for c in ["Mot", "OpMot", "Val"]: ranking[c] = ranking[c].round(1)
+    decimals = {"Win%": 1, "EV": 2, "Risk": 2, "Mot": 1, "OpMot": 1, "Val": 1}
+    ranking = ranking.assign(**{"Win%": ranking["Win%"] * 100}).round(decimals)
     return ranking
 
-def analyze_league(prefix: str, excel_pl: bool = False):
-    """Main execution flow for a specific league."""
-    l_name = "CHAMPIONS LEAGUE" if prefix == "cl" else "EUROPA LEAGUE"
-    out_path = BASE_DIR / f"{prefix}_recommendations.csv"
-    
+# ========================================
+# RESULT CACHE
+# ========================================
+CACHE_DIR: Path = BASE_DIR / ".cache"
+
+def cache_path_for(prefix: str) -> Optional[Path]:
+    """Cache file keyed on (path, mtime, size) of both inputs and this script; None if an input is missing."""
+    h = hashlib.blake2b(digest_size=8)
+    try:
+        for p in (*league_paths(prefix), Path(__file__)):
+            st = p.stat()
+            h.update(f"{p}|{st.st_mtime_ns}|{st.st_size}\n".encode())
+    except FileNotFoundError:
+        return None
+    return CACHE_DIR / f"{prefix}_{h.hexdigest()}.pkl"
+
+def load_cached_ranking(path: Optional[Path]) -> Optional[pd.DataFrame]:
+    """Returns a previously computed ranking, or None on a miss or unreadable cache file."""
+    if path is None or not path.exists(): return None
+    try:
+        return pd.read_pickle(path)
+    except Exception:
+        return None
+
+def save_cached_ranking(path: Optional[Path], ranking: pd.DataFrame) -> None:
+    """Stores the ranking and drops stale entries for the same league. Failures are non-fatal."""
+    if path is None: return
+    prefix = path.name.split("_", 1)[0]
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        for old in CACHE_DIR.glob(f"{prefix}_*.pkl"):
+            if old != path: old.unlink()
+        ranking.to_pickle(path)
+    except OSError:
+        pass
+
+# ========================================
+# PIPELINE
+# ========================================
+def build_ranking(prefix: str, l_name: str) -> pd.DataFrame:
+    """Loads, validates and enriches league data into the sorted recommendation ranking."""
     fixtures, table = load_league_data(prefix)
     
     if len(table) != 36: print(f"ERROR: {l_name} table must have 36 teams."); sys.exit(1)
     if len(fixtures) != 18: print(f"ERROR: {l_name} fixtures must have 18 matches."); sys.exit(1)
 
     # Normalization
-    fixtures["HomeKey"] = fixtures["HomeTeam"].map(norm_key)
-    fixtures["AwayKey"] = fixtures["AwayTeam"].map(norm_key)
-    table["TeamKey"] = table["TEAM"].map(norm_key)
+    fixtures["HomeKey"] = norm_series(fixtures["HomeTeam"])
+    fixtures["AwayKey"] = norm_series(fixtures["AwayTeam"])
+    table["TeamKey"] = norm_series(table["TEAM"])
 
     # Validation
     known = set(table["TeamKey"])
     used = set(fixtures["HomeKey"]).union(set(fixtures["AwayKey"]))
     if missing := sorted(used - known):
         print(f"ERROR: Missing teams in {prefix}_table: {missing}"); sys.exit(1)
+    if dupes := sorted(set(table.loc[table["TeamKey"].duplicated(), "TeamKey"])):
+        print(f"ERROR: Duplicate teams in {prefix}_table: {dupes}"); sys.exit(1)
 
     # Enrichment & Merge
     table = enrich_table(table, l_name)
     t_clean = table[["TeamKey", "TEAM", "Status", "Motivation", "RotRisk"]].set_index("TeamKey")
 
-    f = fixtures.merge(t_clean, left_on="HomeKey", right_index=True)
-    f = f.rename(columns={"TEAM": "HomeTeamName", "Status": "Status_H", "Motivation": "Mot_H", "RotRisk": "Risk_H"})
-    f = f.merge(t_clean, left_on="AwayKey", right_index=True)
-    f = f.rename(columns={"TEAM": "AwayTeamName", "Status": "Status_A", "Motivation": "Mot_A", "RotRisk": "Risk_A"})
+    # Row positions of each side in t_clean (one hash probe per team, no join)
+    f = fixtures
+    h_pos = t_clean.index.get_indexer(f["HomeKey"])
+    a_pos = t_clean.index.get_indexer(f["AwayKey"])
+    for col, h_col, a_col in [("TEAM", "HomeTeamName", "AwayTeamName"), ("Status", "Status_H", "Status_A"),
+                              ("Motivation", "Mot_H", "Mot_A"), ("RotRisk", "Risk_H", "Risk_A")]:
+        f[h_col] = t_clean[col].iloc[h_pos].array
+        f[a_col] = t_clean[col].iloc[a_pos].array
 
     # Probs & EV
-    p_sum = (f["HomeWin%"] + f["Draw%"] + f["AwayWin%"]).replace(0, 1)
-    for c in ["HomeWin%", "Draw%", "AwayWin%"]: f[c] = (f[c] / p_sum).fillna(0.0)
-    f["EV_H"] = 3 * f["HomeWin%"] + 1 * f["Draw%"]
-    f["EV_A"] = 3 * f["AwayWin%"] + 1 * f["Draw%"]
+    prob_cols = ["HomeWin%", "Draw%", "AwayWin%"]
+    probs = f[prob_cols].to_numpy(np.float64, copy=True)
+    p_sum = probs.sum(axis=1, keepdims=True)
+    p_sum[p_sum == 0] = 1.0
+    probs /= p_sum
+    np.nan_to_num(probs, copy=False, nan=0.0)
+    f[prob_cols] = probs
+    f["EV_H"] = 3 * probs[:, 0] + 1 * probs[:, 1]
+    f["EV_A"] = 3 * probs[:, 2] + 1 * probs[:, 1]
 
     # Final Calcs
     f = calculate_values(f)
 
     # Flatten & Rank
-    h = f[["HomeTeamName", "AwayTeamName", "HomeWin%", "EV_H", "Mot_H", "Risk_H", "Status_H", "Val_H", "Mot_A", "Status_A"]].copy()
-    a = f[["AwayTeamName", "HomeTeamName", "AwayWin%", "EV_A", "Mot_A", "Risk_A", "Status_A", "Val_A", "Mot_H", "Status_H"]].copy()
-    
+    h_cols = ["HomeTeamName", "AwayTeamName", "HomeWin%", "EV_H", "Mot_H", "Risk_H", "Status_H", "Val_H", "Mot_A", "Status_A"]
+    a_cols = ["AwayTeamName", "HomeTeamName", "AwayWin%", "EV_A", "Mot_A", "Risk_A", "Status_A", "Val_A", "Mot_H", "Status_H"]
     idx_cols = ["Team", "Opp", "Win%", "EV", "Mot", "Risk", "Status", "Val", "OpMot", "OpStatus"]
-    h.columns = a.columns = idx_cols
-    
-    ranking = pd.concat([h, a]).sort_values("Val", ascending=False)
-    ranking = format_recommendations(ranking)
+
+    def stacked(hc: str, ac: str):
+        # Home rows followed by away rows; categoricals are joined by code to keep the dtype
+        h, a = f[hc], f[ac]
+        if isinstance(h.dtype, pd.CategoricalDtype):
+            return pd.Categorical.from_codes(np.concatenate([h.cat.codes, a.cat.codes]), dtype=h.dtype)
+        return np.concatenate([h.to_numpy(), a.to_numpy()])
+
+    flat = {c: stacked(hc, ac) for c, hc, ac in zip(idx_cols, h_cols, a_cols)}
+    order = np.argsort(-flat["Val"], kind="stable")
+    ranking = format_recommendations(pd.DataFrame({c: arr[order] for c, arr in flat.items()}))
+    # Kept with the cached result so a cache hit can repeat the audit
+    ranking.attrs["integrity_report"] = table.attrs["integrity_report"]
+    return ranking
+
+def write_arrow_csv(ranking: pd.DataFrame, out_path: Path) -> bool:
+    """Writes `ranking` with pyarrow's CSV writer. Returns False if pyarrow is not installed."""
+    try:
+        import pyarrow as pa  # optional: C CSV writer, imported only for --arrow-csv
+        import pyarrow.csv as pacsv
+    except ImportError:
+        print("⚠️  --arrow-csv requires pyarrow (pip install pyarrow); using the standard writer")
+        return False
+    with open(out_path, "wb") as fh:
+        pacsv.write_csv(pa.Table.from_pandas(ranking, preserve_index=False), fh)
+    return True
+
+def analyze_league(prefix: str, excel_pl: bool = False, use_cache: bool = True, arrow_csv: bool = False):
+    """Main execution flow for a specific league."""
+    l_name = "CHAMPIONS LEAGUE" if prefix == "cl" else "EUROPA LEAGUE"
+    out_path = BASE_DIR / f"{prefix}_recommendations.csv"
+
+    cache_path = cache_path_for(prefix) if use_cache else None
+    ranking = load_cached_ranking(cache_path)
+    if ranking is not None:
+        print(f"\n♻️  {l_name}: inputs unchanged, using cached results (--no-cache to recompute)")
+        print(ranking.attrs.get("integrity_report", ""))
+    else:
+        ranking = build_ranking(prefix, l_name)
+        save_cached_ranking(cache_path, ranking)
 
     print(f"\n--- {l_name} TOP 10 RECOMMENDATIONS ---")
     print(ranking.head(10).to_string(index=False))
@@ -263,6 +401,8 @@ def analyze_league(prefix: str, excel_pl: bool = False):
     try:
         if excel_pl:
             ranking.to_csv(out_path, sep=";", index=False, encoding="utf-8-sig", decimal=",")
+        elif arrow_csv and write_arrow_csv(ranking, out_path):
+            pass  # written by pyarrow
         else:
             ranking.to_csv(out_path, sep=",", index=False, encoding="utf-8", decimal=".")
         print(f"✅ Saved: {out_path.name}")
@@ -274,8 +414,11 @@ if __name__ == "__main__":
     parser.add_argument("--cl", action="store_true", help="Analyze Champions League")
     parser.add_argument("--el", action="store_true", help="Analyze Europa League")
     parser.add_argument("--excel-pl", action="store_true", help="Output in Polish Excel format (; separator, , decimal)")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute even if input files are unchanged")
+    parser.add_argument("--arrow-csv", action="store_true", help="Write the default-format CSV with pyarrow (quoted text, no trailing .0)")
     args = parser.parse_args()
 
     run_all = not (args.cl or args.el)
-    if run_all or args.cl: analyze_league("cl", excel_pl=args.excel_pl)
-    if run_all or args.el: analyze_league("el", excel_pl=args.excel_pl)
+    use_cache = not args.no_cache
+    if run_all or args.cl: analyze_league("cl", excel_pl=args.excel_pl, use_cache=use_cache, arrow_csv=args.arrow_csv)
+    if run_all or args.el: analyze_league("el", excel_pl=args.excel_pl, use_cache=use_cache, arrow_csv=args.arrow_csv)